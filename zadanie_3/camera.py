@@ -0,0 +1,115 @@
+import math
+
+MIN_ZOOM = 0.01
+MAX_ZOOM = 8.0
+GRID_CELL_SIZE = 200
+
+
+class Camera:
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0.0  # Мировая координата левого верхнего угла экрана
+        self.y = 0.0
+        self.zoom = 1.0  # Пикселей экрана на единицу мира
+
+    def world_to_screen(self, x, y):
+        return (x - self.x) * self.zoom, (y - self.y) * self.zoom
+
+    def screen_to_world(self, sx, sy):
+        return self.x + sx / self.zoom, self.y + sy / self.zoom
+
+    def visible_rect(self):
+        return (self.x, self.y,
+                self.x + self.view_width / self.zoom,
+                self.y + self.view_height / self.zoom)
+
+    def pan(self, dx, dy):
+        # Сдвиг в пикселях экрана
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, sx, sy):
+        # Масштабирование относительно точки экрана (под курсором)
+        wx, wy = self.screen_to_world(sx, sy)
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        self.x = wx - sx / self.zoom
+        self.y = wy - sy / self.zoom
+        self.clamp()
+
+    def clamp(self):
+        # Центр экрана не должен уходить за границы мира
+        half_w = self.view_width / self.zoom / 2
+        half_h = self.view_height / self.zoom / 2
+        cx = min(max(self.x + half_w, 0), self.world_width)
+        cy = min(max(self.y + half_h, 0), self.world_height)
+        self.x = cx - half_w
+        self.y = cy - half_h
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # Клетка -> упорядоченное множество объектов
+        self.keys = {}  # Объект -> его клетка
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def clear(self):
+        self.cells.clear()
+        self.keys.clear()
+
+    def insert(self, obj, x, y):
+        key = self._cell(x, y)
+        self.cells.setdefault(key, {})[obj] = None
+        self.keys[obj] = key
+
+    def remove(self, obj):
+        key = self.keys.pop(obj, None)
+        if key is None:
+            return
+        cell = self.cells[key]
+        del cell[obj]
+        if not cell:
+            del self.cells[key]
+
+    def move(self, obj, x, y):
+        # Объект перекладывается, только если перешёл в другую клетку
+        key = self._cell(x, y)
+        if self.keys.get(obj) == key:
+            return
+        self.remove(obj)
+        self.cells.setdefault(key, {})[obj] = None
+        self.keys[obj] = key
+
+    def _cells_in(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        # Если клеток в прямоугольнике больше, чем непустых, обходим словарь
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            for (cx, cy), cell in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield cx, cy, cell
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    cell = self.cells.get((cx, cy))
+                    if cell:
+                        yield cx, cy, cell
+
+    def query(self, x0, y0, x1, y1):
+        # Объекты из клеток, пересекающих прямоугольник
+        result = []
+        for _, _, cell in self._cells_in(x0, y0, x1, y1):
+            result.extend(cell)
+        return result
+
+    def cell_counts(self, x0, y0, x1, y1):
+        # Агрегированное представление: (x, y, размер клетки, число объектов)
+        size = self.cell_size
+        return [(cx * size, cy * size, size, len(cell))
+                for cx, cy, cell in self._cells_in(x0, y0, x1, y1)]
@@ -0,0 +1,337 @@
+import argparse
+import sys
+import time
+import numpy as np
+from models import (FRAME_RATE, LAMPPOST_RESTORE_TIME, LAMPPOST_WIDTH,
+                    LAMPPOST_HEIGHT, BIRD_SPEED, BIRD_ARC, FLY_UP_SPREAD,
+                    FLY_UP_TARGET_Y, WORLD_MARGIN, world_size)
+from scenario import ScenarioError, read_chunks
+
+# Состояния птиц
+IDLE = 0  # Ищет столб
+APPROACH = 1  # Летит к столбу
+SITTING = 2
+FLYING_UP = 3  # Взлетает (со столба или улетая насовсем)
+GONE = 4  # Улетела из мира
+
+# Назначения случайных чисел: у каждой птицы за шаг не больше одного каждого
+CHOOSE_LAMPPOST = 0
+FLY_UP_X = 1
+FLY_UP_Y = 2
+NUM_STREAMS = 3
+
+
+def base_world_size(lampposts, birds):
+    # Границы мира по начальному состоянию, как в окне симуляции
+    max_x = max(np.max(lampposts['x'] + LAMPPOST_WIDTH, initial=0),
+                np.max(birds['x'], initial=0))
+    max_y = max(np.max(lampposts['y'] + LAMPPOST_HEIGHT, initial=0),
+                np.max(birds['y'], initial=0))
+    return world_size(float(max_x), float(max_y))
+
+
+def load_base_state(path):
+    # Начальное состояние одной реплики в виде столбцов numpy
+    parts = {'lamppost': [], 'bird': []}
+    for kind, columns in read_chunks(path):
+        parts[kind].append(columns)
+
+    def concat(kind, name, dtype):
+        arrays = [columns[name] for columns in parts[kind]]
+        return np.concatenate(arrays).astype(dtype) if arrays else np.empty(0, dtype)
+
+    lampposts = {name: concat('lamppost', name, dtype) for name, dtype in
+                 (('x', np.float64), ('y', np.float64), ('max_birds', np.int32))}
+    birds = {name: concat('bird', name, np.float64)
+             for name in ('x', 'y', 'sitting_time')}
+    return lampposts, birds
+
+
+class Ensemble:
+    def __init__(self, lampposts, birds, replicas, seed=None):
+        # Реплика i получает зерно seed + i, как World в run_sequential, и её
+        # случайные числа зависят только от этого зерна: любую реплику можно
+        # пересчитать отдельно с --replicas 1 --seed <её зерно>
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.seed = seed
+        self.seeds = [seed + i for i in range(replicas)]
+        self.keys = np.array([np.random.SeedSequence(s).generate_state(1, np.uint64)[0]
+                              for s in self.seeds], dtype=np.uint64)
+        self.replicas = replicas
+        self.world_width, self.world_height = base_world_size(lampposts, birds)
+        shape = (replicas, len(birds['x']))
+        lp_shape = (replicas, len(lampposts['x']))
+
+        # Столбы одинаково расположены во всех мирах, различается только состояние
+        self.lp_target_x = lampposts['x'] + LAMPPOST_WIDTH / 2
+        self.lp_target_y = lampposts['y']
+        self.max_birds = lampposts['max_birds']
+        self.standing = np.ones(lp_shape, dtype=bool)
+        self.fall_time = np.zeros(lp_shape)
+
+        # Птицы: массивы (мир, птица)
+        self.x = np.broadcast_to(birds['x'], shape).copy()
+        self.y = np.broadcast_to(birds['y'], shape).copy()
+        self.sitting_time = np.broadcast_to(birds['sitting_time'], shape).copy()
+        self.time_sat = np.zeros(shape)
+        self.state = np.full(shape, IDLE, dtype=np.int8)
+        self.lamppost = np.full(shape, -1, dtype=np.int64)
+        self.departing = np.zeros(shape, dtype=bool)
+        self.x0 = self.x.copy()
+        self.y0 = self.y.copy()
+        self.target_x = self.x.copy()
+        self.target_y = self.y.copy()
+        self.h = np.zeros(shape)
+        self.t = np.zeros(shape)
+        self.total_time = np.zeros(shape)
+
+        # Метрики по репликам
+        self.collapses = np.zeros(replicas, dtype=np.int64)
+        self.departed = np.zeros(replicas, dtype=np.int64)
+        self.sitting_ticks = np.zeros(replicas, dtype=np.int64)
+        self.peak_sitting = np.zeros(replicas, dtype=np.int64)
+        self.ticks = 0
+        self.bird_ticks = 0
+
+    def _uniform(self, w, b, stream):
+        # Счётчиковый генератор (splitmix64): число в [0, 1) определяется
+        # ключом мира, номером шага, птицей и назначением
+        counter = ((self.ticks * self.x.shape[1] + b) * NUM_STREAMS
+                   + stream).astype(np.uint64)
+        z = self.keys[w] + counter * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+        return (z >> np.uint64(11)) * 2.0 ** -53
+
+    def _integers(self, w, b, stream, low, high):
+        # Целые от low до high включительно
+        return low + (self._uniform(w, b, stream) * (high - low + 1)).astype(np.int64)
+
+    def _start_flight(self, w, b, target_x, target_y, state):
+        self.x0[w, b] = self.x[w, b]
+        self.y0[w, b] = self.y[w, b]
+        self.target_x[w, b] = target_x
+        self.target_y[w, b] = target_y
+        distance = np.hypot(target_x - self.x[w, b], target_y - self.y[w, b])
+        self.total_time[w, b] = distance / (BIRD_SPEED * FRAME_RATE)
+        self.t[w, b] = 0
+        self.h[w, b] = distance * BIRD_ARC
+        self.state[w, b] = state
+
+    def _start_flying_up(self, mask, departing):
+        w, b = np.nonzero(mask)
+        target_x = self.x[w, b] + self._integers(
+            w, b, FLY_UP_X, -FLY_UP_SPREAD, FLY_UP_SPREAD)
+        target_y = self._integers(w, b, FLY_UP_Y, *FLY_UP_TARGET_Y)
+        self.lamppost[w, b] = -1
+        self.departing[w, b] |= departing
+        self._start_flight(w, b, target_x, target_y, FLYING_UP)
+
+    def _choose_lampposts(self, idle):
+        # Случайный стоящий столб своего мира для каждой ищущей птицы
+        n_standing = self.standing.sum(axis=1)
+        w, b = np.nonzero(idle & (n_standing > 0)[:, None])
+        if len(w) == 0:
+            return
+        num_lampposts = self.standing.shape[1]
+        row_offset = np.concatenate(([0], np.cumsum(n_standing)[:-1]))
+        cumulative = (np.cumsum(self.standing, axis=1)
+                      + row_offset[:, None]).ravel()
+        k = (self._uniform(w, b, CHOOSE_LAMPPOST) * n_standing[w]).astype(np.int64)
+        flat = np.searchsorted(cumulative, row_offset[w] + k + 1)
+        lamppost = flat - w * num_lampposts
+        self.lamppost[w, b] = lamppost
+        self._start_flight(w, b, self.lp_target_x[lamppost],
+                           self.lp_target_y[lamppost], APPROACH)
+
+    def _move(self, moving, delta_time):
+        # Движение по параболе к цели; возвращает долетевших
+        total_time = np.where(self.total_time != 0, self.total_time, 0.0001)
+        self.t = np.where(moving, self.t + delta_time / total_time, self.t)
+        arrived = moving & (self.t >= 1)
+        in_flight = moving & ~arrived
+        t = self.t
+        self.x = np.where(in_flight, self.x0 + (self.target_x - self.x0) * t,
+                          np.where(arrived, self.target_x, self.x))
+        self.y = np.where(in_flight, self.y0 + (self.target_y - self.y0) * t
+                          - self.h * 4 * t * (1 - t),
+                          np.where(arrived, self.target_y, self.y))
+        return arrived
+
+    def step(self, delta_time):
+        # Правила те же, что у models.Bird.update и World.update (без
+        # появления новых объектов): каждая птица за шаг проходит одну ветку,
+        # выбранную по её состоянию в начале шага, затем удаляются вылетевшие
+        # за границы мира, затем обновляются столбы
+        alive = self.state != GONE
+        done = alive & ~self.departing & (self.time_sat >= self.sitting_time)
+        flying = ~done & (self.state == FLYING_UP)
+        sitting = ~done & (self.state == SITTING)
+        idle = ~done & (self.state == IDLE)
+        approach = ~done & (self.state == APPROACH)
+
+        # Насидевшиеся птицы улетают насовсем
+        if done.any():
+            self._start_flying_up(done, True)
+
+        # Взлетающие и летящие к столбу
+        arrived = self._move(flying | approach, delta_time)
+        landed_up = arrived & flying
+        self.state[landed_up & self.departing] = GONE
+        self.state[landed_up & ~self.departing] = IDLE
+        self.state[arrived & approach] = SITTING
+
+        # Сидящие копят время; со столба, который упал, взлетают
+        self.time_sat[sitting] += delta_time * 1000
+        w, b = np.nonzero(sitting)
+        on_fallen = ~self.standing[w, self.lamppost[w, b]]
+        if on_fallen.any():
+            mask = np.zeros_like(sitting)
+            mask[w[on_fallen], b[on_fallen]] = True
+            self._start_flying_up(mask, False)
+
+        # Ищущие выбирают столб; полёт к нему начнётся со следующего шага
+        self._choose_lampposts(idle)
+
+        # Взлетающие за границы мира удаляются
+        outside = ((self.state == FLYING_UP)
+                   & ((self.y < -WORLD_MARGIN)
+                      | (self.y > self.world_height + WORLD_MARGIN)
+                      | (self.x < -WORLD_MARGIN)
+                      | (self.x > self.world_width + WORLD_MARGIN)))
+        self.state[outside] = GONE
+        self.departed += (alive & (self.state == GONE)).sum(axis=1)
+
+        # Столбы: падение при перегрузке, восстановление упавших
+        sitting = self.state == SITTING
+        w, b = np.nonzero(sitting)
+        replicas, num_lampposts = self.standing.shape
+        occupancy = np.bincount(w * num_lampposts + self.lamppost[w, b],
+                                minlength=replicas * num_lampposts)
+        occupancy = occupancy.reshape(replicas, num_lampposts)
+        was_fallen = ~self.standing
+        collapsed = self.standing & (occupancy > self.max_birds)
+        if collapsed.any():
+            self.standing[collapsed] = False
+            self.fall_time[collapsed] = LAMPPOST_RESTORE_TIME
+            self.collapses += collapsed.sum(axis=1)
+            dropped = sitting & collapsed[np.arange(replicas)[:, None],
+                                          np.maximum(self.lamppost, 0)]
+            self.state[dropped] = IDLE
+            self.lamppost[dropped] = -1
+            sitting &= ~dropped
+        self.fall_time[was_fallen] -= delta_time * 1000
+        self.standing |= was_fallen & (self.fall_time <= 0)
+
+        sitting_count = sitting.sum(axis=1)
+        self.sitting_ticks += sitting_count
+        np.maximum(self.peak_sitting, sitting_count, out=self.peak_sitting)
+        self.ticks += 1
+        self.bird_ticks += int(alive.sum())
+
+    def run(self, ticks, delta_time=1 / FRAME_RATE):
+        for _ in range(ticks):
+            self.step(delta_time)
+
+    def summary(self):
+        ticks = max(self.ticks, 1)
+        return {
+            'collapses': self.collapses,
+            'departed': self.departed,
+            'remaining': (self.state != GONE).sum(axis=1),
+            'mean_sitting': self.sitting_ticks / ticks,
+            'peak_sitting': self.peak_sitting,
+            'standing': self.standing.sum(axis=1),
+        }
+
+
+def run_sequential(path, replicas, ticks, seed=None):
+    # Те же реплики по одной через World из окна симуляции — для сравнения
+    # скорости и статистики. Реплика i получает то же зерно seed + i, но
+    # World берёт случайные числа из своих генераторов, поэтому совпадают
+    # правила, а не отдельные траектории
+    from world import World
+
+    delta_time = 1 / FRAME_RATE
+    metrics = {name: np.zeros(replicas, dtype=dtype) for name, dtype in (
+        ('collapses', np.int64), ('departed', np.int64),
+        ('remaining', np.int64), ('mean_sitting', np.float64),
+        ('peak_sitting', np.int64), ('standing', np.int64))}
+    bird_ticks = 0
+    for i in range(replicas):
+        world = World(None if seed is None else seed + i)
+        world.load(path)
+        sitting_ticks = 0
+        peak_sitting = 0
+        for _ in range(ticks):
+            bird_ticks += len(world.birds)
+            world.update(delta_time)
+            sitting_count = sum(bird.is_sitting for bird in world.birds)
+            sitting_ticks += sitting_count
+            peak_sitting = max(peak_sitting, sitting_count)
+        metrics['collapses'][i] = world.collapses
+        metrics['departed'][i] = world.departed_birds
+        metrics['remaining'][i] = len(world.birds)
+        metrics['mean_sitting'][i] = sitting_ticks / max(ticks, 1)
+        metrics['peak_sitting'][i] = peak_sitting
+        metrics['standing'][i] = len(world.standing_lampposts)
+    return metrics, bird_ticks
+
+
+def print_summary(summary, seeds):
+    # У крайних значений указано зерно реплики, чтобы её можно было пересчитать
+    for name, values in summary.items():
+        low, high = np.argmin(values), np.argmax(values)
+        print(f"  {name:>13}: среднее {np.mean(values):9.2f}  "
+              f"ст. откл. {np.std(values):8.2f}  "
+              f"мин {values[low]:8.2f} (зерно {seeds[low]})  "
+              f"макс {values[high]:8.2f} (зерно {seeds[high]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Ансамбль независимых миров, считаемых одновременно')
+    parser.add_argument('scenario', nargs='?', default='initial_state.json')
+    parser.add_argument('--replicas', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=FRAME_RATE * 60)
+    parser.add_argument('--seed', type=int, default=None,
+                        help='зерно первой реплики; у реплики i зерно SEED + i')
+    parser.add_argument('--compare', action='store_true',
+                        help='для сравнения прогнать те же реплики по одной через World')
+    args = parser.parse_args()
+
+    try:
+        lampposts, birds = load_base_state(args.scenario)
+    except ScenarioError as e:
+        print(f"Ошибка сценария: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    ensemble = Ensemble(lampposts, birds, args.replicas, args.seed)
+    start = time.perf_counter()
+    ensemble.run(args.ticks)
+    elapsed = time.perf_counter() - start
+
+    print(f"Реплик: {args.replicas}, шагов: {args.ticks}, "
+          f"столбов: {len(lampposts['x'])}, птиц: {len(birds['x'])}, "
+          f"зёрна: {ensemble.seed}..{ensemble.seeds[-1]}")
+    print_summary(ensemble.summary(), ensemble.seeds)
+    print(f"Ансамбль: {elapsed:.2f} с, "
+          f"{ensemble.bird_ticks / elapsed:.0f} птицо-шагов/с")
+
+    if args.compare:
+        start = time.perf_counter()
+        summary, bird_ticks = run_sequential(args.scenario, args.replicas,
+                                             args.ticks, ensemble.seed)
+        sequential = time.perf_counter() - start
+        print(f"По одной через World ({args.replicas} реплик, те же правила, "
+              f"другие случайные числа — сравнимы распределения):")
+        print_summary(summary, ensemble.seeds)
+        print(f"По одной: {sequential:.2f} с, "
+              f"{bird_ticks / sequential:.0f} птицо-шагов/с, "
+              f"ансамбль быстрее в {sequential / elapsed:.1f} раза")
+
+
+if __name__ == '__main__':
+    main()
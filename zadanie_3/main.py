@@ -1,45 +1,76 @@
 import sys
-import random
-import json
 import os
+import argparse
 from PyQt5.QtWidgets import QApplication, QWidget, QSlider, QVBoxLayout, QLabel, QSpinBox, QHBoxLayout, QPushButton, QDialog, QFormLayout, QGridLayout
-from PyQt5.QtGui import QPainter, QBrush, QPen
+from PyQt5.QtGui import QPainter, QBrush, QPen, QColor
 from PyQt5.QtCore import Qt, QTimer, QPointF, QRectF
-from models import Bird, LampPost
-
-WINDOW_WIDTH = 800
-WINDOW_HEIGHT = 600
-NUM_BIRDS = 11
-NUM_LAMPPOSTS = 6
+from models import (LampPost, LAMPPOST_WIDTH, LAMPPOST_HEIGHT,
+                    LAMPPOST_CROSSBAR, WORLD_WIDTH, WORLD_HEIGHT)
+from camera import Camera
+from spawner import slider_to_rate
+from scenario import ScenarioError, scenario_format
+from world import World
+
+WINDOW_WIDTH = WORLD_WIDTH  # Мир наименьшего размера виден целиком
+WINDOW_HEIGHT = WORLD_HEIGHT
 FRAME_RATE = 60
+SIMPLE_DRAW_ZOOM = 0.5  # Ниже этого масштаба рисуем точки и линии
+AGGREGATE_DRAW_ZOOM = 0.1  # Ниже этого масштаба рисуем плотность по клеткам
+ZOOM_STEP = 1.15
+DEFAULT_SCENARIO = 'initial_state.json'
+# Птиц в секунду при максимальном положении слайдера. Птица живёт около 100 с,
+# и при большей частоте число птиц перестаёт укладываться в кадр;
+# тысячи птиц в секунду проверяются без окна: python world.py --bird-rate N
+MAX_BIRD_SPAWN_RATE = 150
+MAX_LAMPPOST_SPAWN_RATE = 10
+# Окно хранит птиц и столбы объектами Python: птицы обновляются каждый кадр
+# (~1 мкс на птицу), столбы стоят памяти и времени загрузки. Большие сценарии
+# считаются без окна в ensemble.py, где состояние хранится в массивах numpy
+MAX_WINDOW_BIRDS = 10000
+MAX_WINDOW_LAMPPOSTS = 200000
 
 
 class SimulationWindow(QWidget):
-    def __init__(self):
+    def __init__(self, scenario_path=DEFAULT_SCENARIO, seed=None, save_path=None):
         super().__init__()
         self.setWindowTitle('Птицы и столбы')
         self.setFixedSize(WINDOW_WIDTH, WINDOW_HEIGHT)
 
         # Инициализация состояния
-        self.birds = []
-        self.lampposts = []
+        self.world = World(seed)
         self.paused = False  
+        self.scenario_path = scenario_path
+        # Состояние сохраняется в рабочий initial_state.json, как и раньше, либо
+        # в явно указанный файл; переданный сценарий никогда не перезаписывается
+        self.is_default_scenario = (os.path.abspath(scenario_path)
+                                    == os.path.abspath(DEFAULT_SCENARIO))
+        if save_path is None and self.is_default_scenario:
+            save_path = DEFAULT_SCENARIO
+        if save_path is not None:
+            scenario_format(save_path)
+            # Отсутствующий сценарий не проверяется: его загрузка сообщит об ошибке
+            if (not self.is_default_scenario and os.path.exists(save_path)
+                    and os.path.exists(scenario_path)
+                    and os.path.samefile(save_path, scenario_path)):
+                raise ScenarioError(
+                    f"{save_path}: сохранение перезаписало бы исходный сценарий")
+        self.save_path = save_path
+        self.pan_origin = None
 
         self.init_ui()
 
         # Загрузка начального состояния из файла
         self.load_initial_state()
 
+        # Камера над миром, размер которого определён загруженным состоянием
+        self.camera = Camera(WINDOW_WIDTH, WINDOW_HEIGHT,
+                             self.world.width, self.world.height)
+
         # Таймер
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_simulation)
         self.timer.start(1000 // FRAME_RATE)  # 60 FPS
 
-        self.bird_spawn_timer = 0
-        self.lamppost_spawn_timer = 0
-        self.bird_spawn_interval = 9999999999
-        self.lamppost_spawn_interval = 9999999999
-
         self.last_time = 0
 
     def init_ui(self):
@@ -82,156 +113,117 @@ class SimulationWindow(QWidget):
 
     def update_bird_frequency(self):
         slider_value = self.bird_frequency_slider.value()
-        self.bird_spawn_interval = max(1000, 10000 - slider_value * 90)
+        self.world.bird_source.rate = slider_to_rate(
+            slider_value, MAX_BIRD_SPAWN_RATE)
 
     def update_lamppost_frequency(self):
         slider_value = self.lamppost_frequency_slider.value()
-        self.lamppost_spawn_interval = max(1000, 10000 - slider_value * 90)
+        self.world.lamppost_source.rate = slider_to_rate(
+            slider_value, MAX_LAMPPOST_SPAWN_RATE)
 
     def load_initial_state(self):
-        if os.path.exists('initial_state.json'):
-            try:
-                with open('initial_state.json', 'r') as f:
-                    data = json.load(f)
-                    if 'lampposts' in data and 'birds' in data:
-                        # Загрузка столбов
-                        for lp_data in data['lampposts']:
-                            lamppost = LampPost(
-                                lp_data['x'], lp_data['y'], lp_data['max_birds'])
-                            self.lampposts.append(lamppost)
-                        # Загрузка птиц
-                        for bird_data in data['birds']:
-                            bird = Bird(
-                                bird_data['x'], bird_data['y'], bird_data['sitting_time'])
-                            self.birds.append(bird)
-                    else:
-                        # Если структура данных некорректна, создаём состояние по умолчанию
-                        self.create_default_state()
-            except (json.JSONDecodeError, KeyError):
-                # Если произошла ошибка при чтении файла, создаём состояние по умолчанию
-                self.create_default_state()
-        else:
+        if self.is_default_scenario and not os.path.exists(self.scenario_path):
             # Создание начального состояния по умолчанию
-            self.create_default_state()
-
-    def create_default_state(self):
-        # Создание столбов
-        for _ in range(NUM_LAMPPOSTS):
-            x = random.randint(50, WINDOW_WIDTH - 50)
-            y = random.randint(300, 380)
-            max_birds = 2
-            lamppost = LampPost(x, y, max_birds)
-            self.lampposts.append(lamppost)
-
-        # Создание птиц
-        for _ in range(NUM_BIRDS):
-            x = random.randint(50, WINDOW_WIDTH - 50)
-            y = random.randint(50, 150)
-            sitting_time = 100000
-            bird = Bird(x, y, sitting_time)
-            self.birds.append(bird)
-
-        # Сохранение начального состояния в файл
-        self.save_initial_state()
+            self.world.create_default()
+            self.save_initial_state()
+            return
+        self.world.load(self.scenario_path, MAX_WINDOW_BIRDS, MAX_WINDOW_LAMPPOSTS)
 
     def save_initial_state(self):
-        data = {'lampposts': [], 'birds': []}
-        for lp in self.lampposts:
-            data['lampposts'].append({
-                'x': lp.x,
-                'y': lp.y,
-                'max_birds': lp.max_birds
-            })
-        for bird in self.birds:
-            data['birds'].append({
-                'x': bird.x,
-                'y': bird.y,
-                'sitting_time': bird.sitting_time
-            })
-        with open('initial_state.json', 'w') as f:
-            json.dump(data, f)
+        if self.save_path is not None:
+            self.world.save(self.save_path)
 
     def update_simulation(self):
         if self.paused:
             return
 
         delta_time = 1 / FRAME_RATE
-        self.bird_spawn_timer += delta_time * 1000
-        self.lamppost_spawn_timer += delta_time * 1000
-
-        # Появление новых птиц
-        if self.bird_spawn_timer >= self.bird_spawn_interval:
-            self.spawn_new_bird()
-            self.bird_spawn_timer = 0
-
-        # Появление новых столбов
-        if self.lamppost_spawn_timer >= self.lamppost_spawn_interval:
-            self.spawn_new_lamppost()
-            self.lamppost_spawn_timer = 0
-
-        birds_to_remove = []
-        for bird in self.birds:
-            bird.update(delta_time, self.lampposts)
-
-            if bird.flying_up and (bird.y < -50 or bird.y > WINDOW_HEIGHT + 50 or bird.x < -50 or bird.x > WINDOW_WIDTH + 50):
-                birds_to_remove.append(bird)
-
-        for bird in birds_to_remove:
-            self.birds.remove(bird)
-
-        # Обновление столбов
-        for lp in self.lampposts:
-            lp.update(delta_time)
+        self.world.update(delta_time)
 
         self.repaint()
 
-    def spawn_new_bird(self):
-        x = random.randint(50, WINDOW_WIDTH - 50)
-        y = random.randint(10, 40)
-        sitting_time = 100000
-        bird = Bird(x, y, sitting_time)
-        self.birds.append(bird)
-
-    def spawn_new_lamppost(self):
-        x = random.randint(50, WINDOW_WIDTH - 50)
-        y = random.randint(300, 380)
-        max_birds = 2
-        lamppost = LampPost(x, y, max_birds)
-        self.lampposts.append(lamppost)
-
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        camera = self.camera
+        x0, y0, x1, y1 = camera.visible_rect()
+
+        painter.save()
+        painter.scale(camera.zoom, camera.zoom)
+        painter.translate(-camera.x, -camera.y)
+
+        if camera.zoom < AGGREGATE_DRAW_ZOOM:
+            # Сильное отдаление: плотность объектов по клеткам сетки
+            self.draw_density(painter, x0, y0, x1, y1)
+        elif camera.zoom < SIMPLE_DRAW_ZOOM:
+            # Отдаление: столбы линиями, птицы точками
+            self.draw_simple(painter, x0, y0, x1, y1)
+        else:
+            painter.setRenderHint(QPainter.Antialiasing)
+            self.draw_detailed(painter, x0, y0, x1, y1)
 
+        painter.restore()
+
+    def draw_detailed(self, painter, x0, y0, x1, y1):
         # Рисование столбов
-        for lp in self.lampposts:
+        for lp in self.world.visible_lampposts(x0, y0, x1, y1):
             if lp.status == 'standing':
                 painter.setBrush(QBrush(lp.color))
                 painter.setPen(QPen(Qt.black))
                 rect = QRectF(lp.x, lp.y, lp.width, lp.height)
-                rect2 = QRectF(lp.x - 10, lp.y, 30, 10)
+                rect2 = QRectF(lp.x - LAMPPOST_CROSSBAR, lp.y,
+                               lp.width + 2 * LAMPPOST_CROSSBAR, 10)
                 painter.drawRect(rect)
                 painter.drawRect(rect2)
             else:
 
                 painter.setPen(QPen(Qt.darkGray))
-                painter.drawLine(lp.x, lp.y + lp.height, lp.x + lp.width, lp.y)
+                painter.drawLine(QPointF(lp.x, lp.y + lp.height),
+                                 QPointF(lp.x + lp.width, lp.y))
 
-        for bird in self.birds:
+        for bird in self.world.visible_birds(x0, y0, x1, y1):
             painter.setBrush(QBrush(bird.color))
             painter.setPen(QPen(Qt.black))
             painter.drawEllipse(QPointF(bird.x, bird.y),
                                 bird.radius, bird.radius)
 
+    def draw_simple(self, painter, x0, y0, x1, y1):
+        pen = QPen(QColor(139, 69, 19), 0)
+        painter.setPen(pen)
+        for lp in self.world.visible_lampposts(x0, y0, x1, y1):
+            if lp.status == 'standing':
+                painter.drawLine(QPointF(lp.x + lp.width / 2, lp.y),
+                                 QPointF(lp.x + lp.width / 2, lp.y + lp.height))
+
+        pen = QPen(QColor(0, 0, 255), 3 / self.camera.zoom)
+        painter.setPen(pen)
+        for bird in self.world.visible_birds(x0, y0, x1, y1):
+            painter.drawPoint(QPointF(bird.x, bird.y))
+
+    def draw_density(self, painter, x0, y0, x1, y1):
+        painter.setPen(Qt.NoPen)
+        for x, y, size, count in self.world.lamppost_grid.cell_counts(x0, y0, x1, y1):
+            alpha = min(255, 40 + count * 20)
+            painter.setBrush(QBrush(QColor(139, 69, 19, alpha)))
+            painter.drawRect(QRectF(x, y, size, size))
+        for x, y, size, count in self.world.bird_grid.cell_counts(x0, y0, x1, y1):
+            alpha = min(255, 40 + count * 20)
+            painter.setBrush(QBrush(QColor(0, 0, 255, alpha)))
+            painter.drawRect(QRectF(x, y, size, size))
+
     def closeEvent(self, event):
         self.save_initial_state()
         event.accept()
 
     def mousePressEvent(self, event):
-        x = event.x()
-        y = event.y()
+        # Правая или средняя кнопка — перемещение камеры
+        if event.button() in (Qt.RightButton, Qt.MiddleButton):
+            self.pan_origin = event.pos()
+            return
+        if event.button() != Qt.LeftButton:
+            return
+        x, y = self.camera.screen_to_world(event.x(), event.y())
         clicked_lamppost = None
-        for lp in self.lampposts:
+        for lp in self.world.lamppost_grid.query(x - LAMPPOST_WIDTH, y - LAMPPOST_HEIGHT, x, y):
             if lp.x <= x <= lp.x + lp.width and lp.y <= y <= lp.y + lp.height:
                 clicked_lamppost = lp
                 break
@@ -244,7 +236,24 @@ class SimulationWindow(QWidget):
             dialog = LamppostDialog()
             if dialog.exec_():
                 new_lp = LampPost(x - 5, y, dialog.max_birds_spinbox.value())
-                self.lampposts.append(new_lp)
+                self.world.add_lamppost(new_lp)
+
+    def mouseMoveEvent(self, event):
+        if self.pan_origin is not None:
+            delta = event.pos() - self.pan_origin
+            self.pan_origin = event.pos()
+            self.camera.pan(delta.x(), delta.y())
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() in (Qt.RightButton, Qt.MiddleButton):
+            self.pan_origin = None
+
+    def wheelEvent(self, event):
+        # Колесо мыши — масштабирование относительно курсора
+        steps = event.angleDelta().y() / 120
+        self.camera.zoom_at(ZOOM_STEP ** steps, event.x(), event.y())
+        self.update()
 
 
 class LamppostDialog(QDialog):
@@ -280,7 +289,26 @@ class LamppostDialog(QDialog):
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = SimulationWindow()
+    parser = argparse.ArgumentParser(
+        description='Птицы и столбы',
+        epilog=f'Окно считает в реальном времени не больше {MAX_WINDOW_BIRDS} птиц '
+               f'и {MAX_WINDOW_LAMPPOSTS} столбов; сценарии крупнее отклоняются, '
+               'их следует считать без окна: python ensemble.py СЦЕНАРИЙ --replicas 1')
+    parser.add_argument('scenario', nargs='?', default=DEFAULT_SCENARIO,
+                        help='начальное состояние (.json, .jsonl или .bin)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='зерно для появления объектов и поведения птиц')
+    parser.add_argument('--save', default=None, metavar='PATH',
+                        help='куда сохранить состояние при закрытии окна '
+                             f'(без сценария — в {DEFAULT_SCENARIO}; '
+                             'переданный сценарий не перезаписывается)')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    try:
+        window = SimulationWindow(args.scenario, args.seed, args.save)
+    except ScenarioError as e:
+        print(f"Ошибка сценария: {e}", file=sys.stderr)
+        sys.exit(1)
     window.show()
     sys.exit(app.exec_())
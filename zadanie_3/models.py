@@ -3,23 +3,49 @@ from PyQt5.QtGui import QColor
 
 FRAME_RATE = 60
 LAMPPOST_RESTORE_TIME = 3500
+BIRD_RADIUS = 10
+BIRD_SPEED = 1.3  # Скорость движения птицы
+BIRD_ARC = 0.2  # Высота параболы полета относительно его длины
+FLY_UP_SPREAD = 200  # Насколько далеко по горизонтали улетает взлетевшая птица
+FLY_UP_TARGET_Y = (-200, 50)  # Диапазон высоты, куда она улетает
+LAMPPOST_WIDTH = 10
+LAMPPOST_HEIGHT = 150
+LAMPPOST_CROSSBAR = 10  # Насколько перекладина выступает с каждой стороны столба
+# Наименьший мир — размер окна; больше он становится, только если объекты
+# сценария в окно не помещаются
+WORLD_WIDTH = 800
+WORLD_HEIGHT = 600
+WORLD_MARGIN = 50  # Взлетевшие дальше этого за границу мира птицы удаляются
+
+
+def world_size(max_x, max_y):
+    # Мир не меньше стандартного и с запасом вмещает все объекты
+    return (max(WORLD_WIDTH, max_x + WORLD_MARGIN),
+            max(WORLD_HEIGHT, max_y + WORLD_MARGIN))
 
 
 class Bird:
+    color = QColor(0, 0, 255)  # Общий для всех птиц
+
     def __init__(self, x, y, sitting_time):
+        self.reset(x, y, sitting_time)
+
+    def reset(self, x, y, sitting_time):
+        # Полная инициализация; используется и для птиц из пула
         self.x = x
         self.y = y
         self.target_x = x
         self.target_y = y
-        self.radius = 10
-        self.color = QColor(0, 0, 255)
+        self.radius = BIRD_RADIUS
         self.sitting_time = sitting_time
         self.time_sat = 0  # Время, которое птица уже просидела
         self.is_sitting = False
         self.current_lamppost = None
-        self.speed = 1.3  # Скорость движения птицы
+        self.speed = BIRD_SPEED
         self.flying_up = False  # Индикатор состояния полета вверх
         self.flying_up_time = 0  # Оставшееся время подъема
+        self.departing = False  # Насиделась и улетает насовсем
+        self.gone = False  # Улетела; мир убирает такую птицу
 
         self.t = 0  # Прогресс движения от 0 до 1
         self.total_time = None  # Общее время полета к столбу
@@ -33,17 +59,17 @@ class Bird:
         self.flying_up_time = 10000 * random.random()
         self.x0 = self.x
         self.y0 = self.y
-        self.target_x = self.x + random.randint(-200, 200)
-        self.target_y = -100 + random.randint(-100, 150)
+        self.target_x = self.x + random.randint(-FLY_UP_SPREAD, FLY_UP_SPREAD)
+        self.target_y = random.randint(*FLY_UP_TARGET_Y)
         dx = self.target_x - self.x0
         dy = self.target_y - self.y0
         distance = (dx**2 + dy**2)**0.5
         self.total_time = distance / (self.speed * FRAME_RATE)
         self.t = 0
-        self.h = distance * 0.2  # Параметр для параболической траектории
+        self.h = distance * BIRD_ARC  # Параметр для параболической траектории
 
-    def update(self, delta_time, lampposts):
-        if self.time_sat >= self.sitting_time:
+    def update(self, delta_time, standing_lampposts):
+        if self.time_sat >= self.sitting_time and not self.departing:
             self.fly_away()
             return
 
@@ -54,6 +80,7 @@ class Bird:
                     self.x = self.target_x
                     self.y = self.target_y
                     self.flying_up = False
+                    self.gone = self.departing
                 else:
                     t = self.t
                     self.x = self.x0 + (self.target_x - self.x0) * t
@@ -70,10 +97,9 @@ class Bird:
                 self.start_flying_up()
         else:
             if not self.current_lamppost:
-                available_lampposts = [
-                    lp for lp in lampposts if lp.status == 'standing']
-                if available_lampposts:
-                    self.current_lamppost = random.choice(available_lampposts)
+                lamppost = standing_lampposts.choice()
+                if lamppost is not None:
+                    self.current_lamppost = lamppost
                     self.target_x = self.current_lamppost.x + self.current_lamppost.width / 2
                     self.target_y = self.current_lamppost.y
 
@@ -84,7 +110,7 @@ class Bird:
                     distance = (dx**2 + dy**2)**0.5
                     self.total_time = distance / (self.speed * FRAME_RATE)
                     self.t = 0
-                    self.h = distance * 0.2
+                    self.h = distance * BIRD_ARC
             else:
                 if self.t < 1:
                     if self.total_time != 0:
@@ -112,6 +138,7 @@ class Bird:
         if self.current_lamppost and self in self.current_lamppost.current_birds:
             self.current_lamppost.current_birds.remove(self)
         self.current_lamppost = None
+        self.departing = True
         self.start_flying_up()
 
 
@@ -120,8 +147,8 @@ class LampPost:
         self.x = x
         self.y = y
 
-        self.width = 10
-        self.height = 150
+        self.width = LAMPPOST_WIDTH
+        self.height = LAMPPOST_HEIGHT
         self.color = QColor(139, 69, 19)
         self.max_birds = max_birds
         self.current_birds = []
@@ -142,3 +169,30 @@ class LampPost:
             if self.fall_time <= 0:
                 self.status = 'standing'
                 self.color = QColor(139, 69, 19)
+
+
+class StandingLampPosts:
+    # Стоящие столбы: случайный выбор, добавление и удаление за O(1)
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, lamppost):
+        if lamppost not in self.index:
+            self.index[lamppost] = len(self.items)
+            self.items.append(lamppost)
+
+    def remove(self, lamppost):
+        i = self.index.pop(lamppost, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if last is not lamppost:
+            self.items[i] = last
+            self.index[last] = i
+
+    def choice(self):
+        return random.choice(self.items) if self.items else None
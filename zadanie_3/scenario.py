@@ -0,0 +1,363 @@
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import time
+import numpy as np
+
+CHUNK_SIZE = 65536
+GENERATED_WORLD_WIDTH = 8000  # Генерируемые сценарии шире окна
+MIN_GENERATED_WORLD_WIDTH = 100  # Объекты ставятся не ближе 50 к краям
+BINARY_MAGIC = b'BRDSCN01'
+BLOCK_HEADER = struct.Struct('<BI')  # Код вида объектов, число записей в блоке
+
+# Столбцы каждого вида объектов: имя поля и тип в бинарном формате
+FIELDS = {
+    'lamppost': (('x', '<f8'), ('y', '<f8'), ('max_birds', '<i4')),
+    'bird': (('x', '<f8'), ('y', '<f8'), ('sitting_time', '<f8')),
+}
+KIND_CODES = {'lamppost': 0, 'bird': 1}
+KINDS_BY_CODE = {code: kind for kind, code in KIND_CODES.items()}
+MAX_BIRDS_LIMIT = np.iinfo(np.int32).max  # max_birds хранится как int32
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def scenario_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.jsonl':
+        return 'jsonl'
+    if ext == '.bin':
+        return 'binary'
+    if ext == '.json':
+        return 'json'
+    raise ScenarioError(f"{path}: неизвестный формат сценария '{ext}' "
+                        "(ожидается .jsonl, .bin или .json)")
+
+
+def _check_record(kind, record, where):
+    # Проверка одной записи, возвращает значения в порядке FIELDS
+    values = []
+    for name, _ in FIELDS[kind]:
+        if name not in record:
+            raise ScenarioError(f"{where}: нет поля '{name}'")
+        value = record[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ScenarioError(
+                f"{where}: поле '{name}' должно быть числом, получено {value!r}")
+        try:
+            # Целые из JSON не ограничены по длине и могут не влезть во float
+            value = float(value)
+        except OverflowError:
+            raise ScenarioError(f"{where}: поле '{name}' слишком велико") from None
+        if not math.isfinite(value):
+            raise ScenarioError(f"{where}: поле '{name}' не конечно")
+        values.append(value)
+    if kind == 'lamppost':
+        if not 1 <= values[2] <= MAX_BIRDS_LIMIT or values[2] != int(values[2]):
+            raise ScenarioError(
+                f"{where}: max_birds должно быть целым от 1 до {MAX_BIRDS_LIMIT}, "
+                f"получено {record['max_birds']!r}")
+        values[2] = int(values[2])
+    if kind == 'bird' and values[2] < 0:
+        raise ScenarioError(
+            f"{where}: sitting_time не может быть отрицательным, получено {values[2]!r}")
+    return values
+
+
+def _check_columns(kind, columns, where, offset):
+    # Векторная проверка блока столбцов из бинарного файла
+    for name, _ in FIELDS[kind]:
+        bad = np.flatnonzero(~np.isfinite(columns[name]))
+        if bad.size:
+            raise ScenarioError(
+                f"{where}: {kind} #{offset + bad[0]}: поле '{name}' не конечно")
+    if kind == 'lamppost':
+        bad = np.flatnonzero(columns['max_birds'] < 1)
+        if bad.size:
+            raise ScenarioError(
+                f"{where}: lamppost #{offset + bad[0]}: max_birds должно быть не меньше 1")
+    else:
+        bad = np.flatnonzero(columns['sitting_time'] < 0)
+        if bad.size:
+            raise ScenarioError(
+                f"{where}: bird #{offset + bad[0]}: sitting_time не может быть отрицательным")
+
+
+def _to_columns(kind, rows):
+    columns = {}
+    for i, (name, dtype) in enumerate(FIELDS[kind]):
+        columns[name] = np.fromiter((row[i] for row in rows),
+                                    dtype=dtype, count=len(rows))
+    return columns
+
+
+def _decode(data, where):
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise ScenarioError(f"{where}: текст не в UTF-8 (байт {e.start} в строке)") from None
+
+
+def _parse_json(text, where):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ScenarioError(f"{where}: некорректный JSON: {e.msg}") from None
+    except ValueError as e:
+        # Например, целое длиннее допустимого числа цифр
+        raise ScenarioError(f"{where}: некорректный JSON: {e}") from None
+    except RecursionError:
+        raise ScenarioError(f"{where}: слишком глубокая вложенность JSON") from None
+
+
+def _read_jsonl(f, path, chunk_size):
+    pending = {kind: [] for kind in FIELDS}
+    with f:
+        for line_number, data in enumerate(f, 1):
+            where = f"{path}:{line_number}"
+            line = _decode(data, where).strip()
+            if not line:
+                continue
+            record = _parse_json(line, where)
+            if not isinstance(record, dict):
+                raise ScenarioError(f"{where}: запись должна быть объектом")
+            kind = record.get('type')
+            if kind not in FIELDS:
+                raise ScenarioError(f"{where}: неизвестный тип записи {kind!r}")
+            rows = pending[kind]
+            rows.append(_check_record(kind, record, where))
+            if len(rows) >= chunk_size:
+                yield kind, _to_columns(kind, rows)
+                rows.clear()
+    for kind, rows in pending.items():
+        if rows:
+            yield kind, _to_columns(kind, rows)
+
+
+def _read_binary(f, path, chunk_size):
+    # chunk_size не используется: блоки читаются такими, какими были записаны
+    offsets = {kind: 0 for kind in FIELDS}
+    with f:
+        file_size = os.fstat(f.fileno()).st_size
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ScenarioError(f"{path}: не является бинарным сценарием")
+        while True:
+            position = f.tell()
+            header = f.read(BLOCK_HEADER.size)
+            if not header:
+                break
+            if len(header) < BLOCK_HEADER.size:
+                raise ScenarioError(f"{path}: обрезанный заголовок блока на байте {position}")
+            code, count = BLOCK_HEADER.unpack(header)
+            if code not in KINDS_BY_CODE:
+                raise ScenarioError(f"{path}: неизвестный вид блока {code} на байте {position}")
+            kind = KINDS_BY_CODE[code]
+            # Размер блока проверяется до чтения, чтобы испорченный счётчик
+            # не приводил к выделению огромного буфера
+            block_size = count * sum(np.dtype(dtype).itemsize for _, dtype in FIELDS[kind])
+            remaining = file_size - f.tell()
+            if block_size > remaining:
+                raise ScenarioError(
+                    f"{path}: обрезанный блок на байте {position}: "
+                    f"{count} записей требуют {block_size} байт, осталось {remaining}")
+            columns = {}
+            for name, dtype in FIELDS[kind]:
+                data = f.read(count * np.dtype(dtype).itemsize)
+                columns[name] = np.frombuffer(data, dtype=dtype)
+            _check_columns(kind, columns, path, offsets[kind])
+            offsets[kind] += count
+            yield kind, columns
+
+
+def _read_json(f, path, chunk_size):
+    # Старый формат initial_state.json: читается целиком
+    with f:
+        raw = f.read()
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError as e:
+        line = raw.count(b'\n', 0, e.start) + 1
+        raise ScenarioError(f"{path}:{line}: текст не в UTF-8 (байт {e.start} файла)") from None
+    data = _parse_json(text, path)
+    if not isinstance(data, dict) or 'lampposts' not in data or 'birds' not in data:
+        raise ScenarioError(f"{path}: ожидается объект с полями 'lampposts' и 'birds'")
+    for kind, key in (('lamppost', 'lampposts'), ('bird', 'birds')):
+        records = data[key]
+        if not isinstance(records, list):
+            raise ScenarioError(f"{path}: поле '{key}' должно быть списком")
+        for start in range(0, len(records), chunk_size):
+            rows = []
+            for i, record in enumerate(records[start:start + chunk_size], start):
+                where = f"{path}: {key}[{i}]"
+                if not isinstance(record, dict):
+                    raise ScenarioError(f"{where}: запись должна быть объектом")
+                rows.append(_check_record(kind, record, where))
+            yield kind, _to_columns(kind, rows)
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    # Поток блоков (вид объектов, {поле: массив numpy}) с проверкой по ходу чтения
+    readers = {'jsonl': _read_jsonl, 'binary': _read_binary, 'json': _read_json}
+    reader = readers[scenario_format(path)]
+    return reader(_open(path, 'rb'), path, chunk_size)
+
+
+def _open(path, mode):
+    # Ошибки открытия файла тоже сообщаются как ScenarioError
+    try:
+        return open(path, mode)
+    except FileNotFoundError:
+        raise ScenarioError(f"{path}: файл не найден") from None
+    except OSError as e:
+        raise ScenarioError(f"{path}: не удаётся открыть файл: {e.strerror}") from None
+
+
+class ScenarioWriter:
+    def __init__(self, path):
+        self.path = path
+        self.format = scenario_format(path)
+        if self.format == 'json':
+            raise ScenarioError(f"{path}: запись поддерживается только в .jsonl и .bin")
+        self.file = _open(path, 'wb')
+        if self.format == 'binary':
+            self.file.write(BINARY_MAGIC)
+
+    def write(self, kind, columns):
+        count = len(columns['x'])
+        if count == 0:
+            return
+        if self.format == 'binary':
+            self.file.write(BLOCK_HEADER.pack(KIND_CODES[kind], count))
+            for name, dtype in FIELDS[kind]:
+                self.file.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        else:
+            names = [name for name, _ in FIELDS[kind]]
+            values = [np.asarray(columns[name]).tolist() for name in names]
+            lines = []
+            for row in zip(*values):
+                record = {'type': kind}
+                record.update(zip(names, row))
+                lines.append(json.dumps(record))
+            self.file.write(('\n'.join(lines) + '\n').encode('utf-8'))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def save(path, lampposts, birds):
+    # Сохранение объектов модели; старый .json пишется как раньше
+    if scenario_format(path) == 'json':
+        data = {
+            'lampposts': [{'x': lp.x, 'y': lp.y, 'max_birds': lp.max_birds}
+                          for lp in lampposts],
+            'birds': [{'x': bird.x, 'y': bird.y, 'sitting_time': bird.sitting_time}
+                      for bird in birds],
+        }
+        with _open(path, 'w') as f:
+            json.dump(data, f)
+        return
+    with ScenarioWriter(path) as writer:
+        for start in range(0, len(lampposts), CHUNK_SIZE):
+            chunk = lampposts[start:start + CHUNK_SIZE]
+            writer.write('lamppost', {
+                'x': [lp.x for lp in chunk],
+                'y': [lp.y for lp in chunk],
+                'max_birds': [lp.max_birds for lp in chunk],
+            })
+        for start in range(0, len(birds), CHUNK_SIZE):
+            chunk = birds[start:start + CHUNK_SIZE]
+            writer.write('bird', {
+                'x': [bird.x for bird in chunk],
+                'y': [bird.y for bird in chunk],
+                'sitting_time': [bird.sitting_time for bird in chunk],
+            })
+
+
+def generate(path, num_lampposts, num_birds, clusters=20, waves=5,
+             world_width=GENERATED_WORLD_WIDTH, seed=None, chunk_size=CHUNK_SIZE):
+    # Столбы группами вокруг случайных центров, птицы волнами над ними
+    if num_lampposts < 0 or num_birds < 0:
+        raise ValueError("Число столбов и птиц не может быть отрицательным")
+    if clusters < 1 or waves < 1:
+        raise ValueError("Нужна хотя бы одна группа столбов и одна волна птиц")
+    if not (math.isfinite(world_width) and world_width > MIN_GENERATED_WORLD_WIDTH):
+        raise ValueError(f"Ширина мира должна быть больше {MIN_GENERATED_WORLD_WIDTH}")
+    rng = np.random.default_rng(seed)
+    cluster_x = rng.uniform(50, world_width - 50, clusters)
+    cluster_spread = rng.uniform(50, 400, clusters)
+    wave_x = rng.uniform(50, world_width - 50, waves)
+    wave_sitting_time = rng.uniform(20000, 200000, waves)
+
+    with ScenarioWriter(path) as writer:
+        for start in range(0, num_lampposts, chunk_size):
+            count = min(chunk_size, num_lampposts - start)
+            cluster = rng.integers(0, len(cluster_x), count)
+            x = rng.normal(cluster_x[cluster], cluster_spread[cluster])
+            writer.write('lamppost', {
+                'x': np.clip(x, 50, world_width - 50),
+                'y': rng.uniform(300, 380, count),
+                'max_birds': rng.integers(1, 6, count),
+            })
+        for start in range(0, num_birds, chunk_size):
+            count = min(chunk_size, num_birds - start)
+            wave = rng.integers(0, len(wave_x), count)
+            x = rng.normal(wave_x[wave], 150)
+            writer.write('bird', {
+                'x': np.clip(x, 50, world_width - 50),
+                'y': rng.uniform(10, 150, count),
+                'sitting_time': rng.normal(wave_sitting_time[wave], 5000).clip(0),
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сценарии начального состояния')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help='сгенерировать сценарий')
+    gen.add_argument('path', help='файл .jsonl или .bin')
+    gen.add_argument('--lampposts', type=int, default=1000)
+    gen.add_argument('--birds', type=int, default=1000)
+    gen.add_argument('--clusters', type=int, default=20,
+                     help='число групп столбов')
+    gen.add_argument('--waves', type=int, default=5,
+                     help='число волн птиц')
+    gen.add_argument('--world-width', type=float, default=GENERATED_WORLD_WIDTH)
+    gen.add_argument('--seed', type=int, default=None)
+
+    check = commands.add_parser('validate', help='проверить сценарий')
+    check.add_argument('path')
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        if args.command == 'generate':
+            generate(args.path, args.lampposts, args.birds, args.clusters,
+                     args.waves, args.world_width, args.seed)
+            print(f"{args.path}: столбов {args.lampposts}, птиц {args.birds}")
+        else:
+            counts = {kind: 0 for kind in FIELDS}
+            for kind, columns in read_chunks(args.path):
+                counts[kind] += len(columns['x'])
+            print(f"{args.path}: столбов {counts['lamppost']}, птиц {counts['bird']}")
+    except ScenarioError as e:
+        print(f"Ошибка сценария: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        # Недопустимые параметры generate проверяются до записи файла
+        parser.error(str(e))
+    print(f"Время: {time.perf_counter() - start:.2f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import numpy as np
+
+FIXED = 'fixed'
+POISSON = 'poisson'
+
+
+class SpawnSource:
+    def __init__(self, kind, rate, region, process=FIXED, attributes=None):
+        if process not in (FIXED, POISSON):
+            raise ValueError(f"Неизвестный процесс появления: {process}")
+        self.kind = kind  # 'bird' или 'lamppost'
+        self.rate = rate  # Объектов в секунду
+        self.region = region  # (x0, y0, x1, y1) в мировых координатах
+        self.process = process
+        self.attributes = attributes or {}  # Общие параметры создаваемых объектов
+        self.accumulator = 0.0  # Дробный остаток для фиксированной частоты
+        self.rng = None
+
+    def due(self, delta_time):
+        # Точное число объектов, которые должны появиться за шаг
+        if self.rate <= 0:
+            return 0
+        if self.process == POISSON:
+            return int(self.rng.poisson(self.rate * delta_time))
+        self.accumulator += self.rate * delta_time
+        # Небольшой допуск, чтобы ошибка округления не откладывала объект на шаг
+        count = int(self.accumulator + 1e-9)
+        self.accumulator -= count
+        return count
+
+
+class SpawnBatch:
+    def __init__(self, source, xs, ys):
+        self.source = source
+        self.kind = source.kind
+        self.attributes = source.attributes
+        self.xs = xs
+        self.ys = ys
+
+    def __len__(self):
+        return len(self.xs)
+
+
+class Spawner:
+    def __init__(self, seed=None):
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.sources = []
+
+    def add_source(self, source):
+        # Каждому источнику свой генератор: добавление нового источника
+        # не меняет последовательность уже существующих
+        source.rng = np.random.default_rng(self.seed_sequence.spawn(1)[0])
+        self.sources.append(source)
+        return source
+
+    def step(self, delta_time):
+        batches = []
+        for source in self.sources:
+            count = source.due(delta_time)
+            if count == 0:
+                continue
+            x0, y0, x1, y1 = source.region
+            xs = source.rng.uniform(x0, x1, count)
+            ys = source.rng.uniform(y0, y1, count)
+            batches.append(SpawnBatch(source, xs, ys))
+        return batches
+
+
+def slider_to_rate(value, max_rate, min_rate=0.1):
+    # Положение слайдера 0..100 в частоту (в секунду) по логарифмической шкале
+    if value <= 0:
+        return 0.0
+    return min_rate * (max_rate / min_rate) ** ((value - 1) / 99)
+
@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from camera import MAX_ZOOM, MIN_ZOOM, Camera, SpatialGrid
+from models import (BIRD_RADIUS, LAMPPOST_CROSSBAR, LAMPPOST_HEIGHT,
+                    LAMPPOST_WIDTH, Bird, LampPost)
+from world import World
+
+
+def test_screen_world_round_trip():
+    camera = Camera(800, 600, 8000, 600)
+    camera.zoom_at(2.5, 100, 100)
+    camera.pan(-300, 40)
+    wx, wy = camera.screen_to_world(123, 456)
+    assert camera.world_to_screen(wx, wy) == pytest.approx((123, 456))
+    x0, y0, x1, y1 = camera.visible_rect()
+    assert (x1 - x0, y1 - y0) == pytest.approx((800 / camera.zoom, 600 / camera.zoom))
+
+
+def test_zoom_keeps_point_under_cursor():
+    camera = Camera(800, 600, 8000, 6000)
+    camera.x, camera.y = 3000, 2000
+    before = camera.screen_to_world(250, 170)
+    camera.zoom_at(1.7, 250, 170)
+    assert camera.zoom == pytest.approx(1.7)
+    assert camera.screen_to_world(250, 170) == pytest.approx(before)
+
+
+def test_zoom_limits():
+    camera = Camera(800, 600, 8000, 600)
+    camera.zoom_at(1e9, 400, 300)
+    assert camera.zoom == MAX_ZOOM
+    camera.zoom_at(1e-9, 400, 300)
+    assert camera.zoom == MIN_ZOOM
+
+
+def test_clamp_keeps_view_centre_inside_world():
+    camera = Camera(800, 600, 8000, 600)
+    camera.zoom_at(2, 400, 300)
+    camera.pan(10 ** 6, 10 ** 6)  # Вправо-вниз на экране — к началу мира
+    x0, y0, x1, y1 = camera.visible_rect()
+    assert ((x0 + x1) / 2, (y0 + y1) / 2) == pytest.approx((0, 0))
+    camera.pan(-10 ** 7, -10 ** 7)
+    x0, y0, x1, y1 = camera.visible_rect()
+    assert ((x0 + x1) / 2, (y0 + y1) / 2) == pytest.approx((8000, 600))
+
+
+def test_grid_query_returns_objects_of_intersecting_cells():
+    grid = SpatialGrid(cell_size=100)
+    points = {'a': (10, 10), 'b': (150, 10), 'c': (-5, -5), 'd': (450, 250)}
+    for name, (x, y) in points.items():
+        grid.insert(name, x, y)
+    assert sorted(grid.query(0, 0, 99, 99)) == ['a']
+    assert sorted(grid.query(50, 0, 100, 50)) == ['a', 'b']
+    assert sorted(grid.query(-1, -1, 0, 0)) == ['a', 'c']
+    assert grid.query(200, 0, 399, 99) == []
+    # Большой прямоугольник обходится через словарь клеток — результат тот же
+    assert sorted(grid.query(-10 ** 6, -10 ** 6, 10 ** 6, 10 ** 6)) == sorted(points)
+    assert sorted(grid.cell_counts(-1000, -1000, 1000, 1000)) == [
+        (-100, -100, 100, 1), (0, 0, 100, 1), (100, 0, 100, 1), (400, 200, 100, 1)]
+
+
+def test_grid_move_and_remove():
+    grid = SpatialGrid(cell_size=100)
+    grid.insert('a', 10, 10)
+    grid.insert('b', 20, 20)
+    grid.move('a', 50, 50)  # Та же клетка
+    assert grid.keys['a'] == (0, 0)
+    grid.move('a', 250, 50)
+    assert grid.query(200, 0, 299, 99) == ['a']
+    assert grid.query(0, 0, 99, 99) == ['b']
+    grid.remove('b')
+    grid.remove('b')  # Повторное удаление ничего не делает
+    assert (0, 0) not in grid.cells
+    assert grid.keys == {'a': (2, 0)}
+
+
+# Окно видимой области, край которого лежит внутри клетки сетки (200)
+VIEW = (130.5, 210.25, 399.5, 505.75)
+
+
+def lamppost_visible(lp, x0, y0, x1, y1):
+    # Прямоугольник, который рисует окно: столб и перекладина
+    return (lp.x - LAMPPOST_CROSSBAR <= x1 and lp.x + lp.width + LAMPPOST_CROSSBAR >= x0
+            and lp.y <= y1 and lp.y + lp.height >= y0)
+
+
+@pytest.mark.parametrize('dx, dy, visible', [
+    (LAMPPOST_CROSSBAR - 1, 0, True),  # Правее окна, перекладина заходит в него
+    (LAMPPOST_CROSSBAR + 1, 0, False),
+    (-LAMPPOST_WIDTH - LAMPPOST_CROSSBAR + 1, 0, True),  # Левее, видна перекладина
+    (-LAMPPOST_WIDTH - LAMPPOST_CROSSBAR - 1, 0, False),
+    (0, -LAMPPOST_HEIGHT + 1, True),  # Выше, виден низ столба
+    (0, -LAMPPOST_HEIGHT - 1, False),
+])
+def test_lamppost_culling_at_view_edges(dx, dy, visible):
+    x0, y0, x1, y1 = VIEW
+    world = World()
+    x = (x1 if dx > 0 else x0) + dx
+    y = y0 + dy if dy else (y0 + y1) / 2
+    lamppost = LampPost(x, y, 2)
+    world.add_lamppost(lamppost)
+    assert lamppost_visible(lamppost, *VIEW) == visible
+    assert (lamppost in world.visible_lampposts(*VIEW)) == visible
+
+
+def test_lamppost_culling_matches_drawn_bounds():
+    rng = random.Random(1)
+    world = World()
+    for _ in range(3000):
+        world.add_lamppost(LampPost(rng.uniform(0, 600), rng.uniform(0, 800), 2))
+    for _ in range(50):
+        x0, y0 = rng.uniform(-100, 500), rng.uniform(-100, 600)
+        view = (x0, y0, x0 + rng.uniform(1, 400), y0 + rng.uniform(1, 400))
+        expected = {id(lp) for lp in world.lampposts if lamppost_visible(lp, *view)}
+        assert {id(lp) for lp in world.visible_lampposts(*view)} == expected
+
+
+def test_bird_culling_matches_drawn_bounds():
+    rng = random.Random(2)
+    world = World()
+    for _ in range(3000):
+        world.birds.append(Bird(rng.uniform(0, 600), rng.uniform(0, 800), 1000))
+    world.rebuild_bird_grid()
+    for _ in range(50):
+        x0, y0 = rng.uniform(-100, 500), rng.uniform(-100, 600)
+        x1, y1 = x0 + rng.uniform(1, 400), y0 + rng.uniform(1, 400)
+        expected = {id(bird) for bird in world.birds
+                    if x0 - BIRD_RADIUS <= bird.x <= x1 + BIRD_RADIUS
+                    and y0 - BIRD_RADIUS <= bird.y <= y1 + BIRD_RADIUS}
+        assert {id(bird) for bird in world.visible_birds(x0, y0, x1, y1)} == expected
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ensemble import GONE, SITTING, Ensemble, run_sequential
+from scenario import save
+from world import World
+
+
+def base_state(num_lampposts=5, num_birds=40, sitting_time=500, max_birds=2):
+    rng = np.random.default_rng(0)
+    lampposts = {'x': rng.uniform(50, 1000, num_lampposts),
+                 'y': rng.uniform(300, 380, num_lampposts),
+                 'max_birds': np.full(num_lampposts, max_birds, dtype=np.int32)}
+    birds = {'x': rng.uniform(50, 1000, num_birds),
+             'y': rng.uniform(50, 150, num_birds),
+             'sitting_time': np.full(num_birds, float(sitting_time))}
+    return lampposts, birds
+
+
+def occupancy(ensemble):
+    replicas, num_lampposts = ensemble.standing.shape
+    w, b = np.nonzero(ensemble.state == SITTING)
+    counts = np.bincount(w * num_lampposts + ensemble.lamppost[w, b],
+                         minlength=replicas * num_lampposts)
+    return counts.reshape(replicas, num_lampposts)
+
+
+def test_standing_lampposts_never_exceed_capacity():
+    lampposts, birds = base_state(sitting_time=2000)
+    ensemble = Ensemble(lampposts, birds, replicas=16, seed=1)
+    for _ in range(600):
+        # Столб, простоявший весь шаг, держит не больше max_birds птиц
+        was_standing = ensemble.standing.copy()
+        ensemble.step(1 / 60)
+        kept = was_standing & ensemble.standing
+        assert (occupancy(ensemble) <= ensemble.max_birds)[kept].all()
+    assert ensemble.collapses.sum() > 0
+
+
+def test_worlds_are_independent():
+    # Упавший столб одного мира не влияет на тот же столб в других
+    lampposts, birds = base_state()
+    ensemble = Ensemble(lampposts, birds, replicas=32, seed=2)
+    ensemble.run(300)
+    assert not (ensemble.standing.all(axis=0) | ~ensemble.standing.any(axis=0)).all()
+    assert len(set(ensemble.collapses.tolist())) > 1
+
+
+def test_same_seed_same_result():
+    lampposts, birds = base_state()
+    a = Ensemble(lampposts, birds, replicas=8, seed=3)
+    b = Ensemble(lampposts, birds, replicas=8, seed=3)
+    a.run(300)
+    b.run(300)
+    for name, values in a.summary().items():
+        np.testing.assert_array_equal(values, b.summary()[name])
+
+
+def test_replica_depends_only_on_its_seed():
+    lampposts, birds = base_state()
+    eight = Ensemble(lampposts, birds, replicas=8, seed=3)
+    nine = Ensemble(lampposts, birds, replicas=9, seed=3)
+    alone = Ensemble(lampposts, birds, replicas=1, seed=3 + 5)
+    for ensemble in (eight, nine, alone):
+        ensemble.run(300)
+    assert nine.seeds[5] == 8
+    for name, values in eight.summary().items():
+        np.testing.assert_array_equal(values, nine.summary()[name][:8])
+        assert values[5] == alone.summary()[name][0]
+    np.testing.assert_array_equal(eight.x, nine.x[:8])
+    np.testing.assert_array_equal(eight.x[5], alone.x[0])
+
+
+@pytest.mark.parametrize('sitting_time', [0, 300])
+def test_birds_that_sat_long_enough_leave(sitting_time):
+    lampposts, birds = base_state(num_lampposts=50, sitting_time=sitting_time,
+                                  max_birds=100)
+    ensemble = Ensemble(lampposts, birds, replicas=4, seed=4)
+    ensemble.run(60 * 20)
+    summary = ensemble.summary()
+    assert (ensemble.state == GONE).all()
+    assert (summary['departed'] == len(birds['x'])).all()
+    assert (summary['remaining'] == 0).all()
+
+
+def test_world_birds_leave_after_sitting(tmp_path):
+    lampposts, birds = base_state(num_lampposts=50, sitting_time=300,
+                                  max_birds=100)
+    path = str(tmp_path / 'state.jsonl')
+    save(path, [SimpleNamespace(x=x, y=y, max_birds=m) for x, y, m in
+                zip(lampposts['x'], lampposts['y'], lampposts['max_birds'])],
+         [SimpleNamespace(x=x, y=y, sitting_time=s) for x, y, s in
+          zip(birds['x'], birds['y'], birds['sitting_time'])])
+    world = World(seed=5)
+    world.load(path)
+    for _ in range(60 * 20):
+        world.update(1 / 60)
+    assert world.birds == []
+    assert world.departed_birds == len(birds['x'])
+
+    summary, _ = run_sequential(path, replicas=2, ticks=60 * 20, seed=5)
+    assert (summary['departed'] == len(birds['x'])).all()
@@ -0,0 +1,184 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from scenario import (BINARY_MAGIC, BLOCK_HEADER, ScenarioError, ScenarioWriter,
+                      generate, read_chunks, save)
+
+
+def read_all(path, chunk_size=1000):
+    columns = {'lamppost': {}, 'bird': {}}
+    for kind, chunk in read_chunks(path, chunk_size):
+        for name, values in chunk.items():
+            columns[kind].setdefault(name, []).append(values)
+    return {kind: {name: np.concatenate(parts) for name, parts in fields.items()}
+            for kind, fields in columns.items()}
+
+
+@pytest.mark.parametrize('ext', ['jsonl', 'bin'])
+def test_generate_round_trip(tmp_path, ext):
+    path = str(tmp_path / f'scenario.{ext}')
+    generate(path, 2500, 1200, seed=1, chunk_size=700)
+    data = read_all(path)
+    assert len(data['lamppost']['x']) == 2500
+    assert len(data['bird']['x']) == 1200
+    assert data['lamppost']['max_birds'].min() >= 1
+
+
+def test_jsonl_and_binary_agree(tmp_path):
+    jsonl = str(tmp_path / 'a.jsonl')
+    binary = str(tmp_path / 'a.bin')
+    generate(jsonl, 300, 200, seed=5)
+    generate(binary, 300, 200, seed=5)
+    a, b = read_all(jsonl), read_all(binary)
+    for kind in a:
+        for name in a[kind]:
+            np.testing.assert_array_equal(a[kind][name], b[kind][name])
+
+
+@pytest.mark.parametrize('ext', ['json', 'jsonl', 'bin'])
+def test_save_round_trip(tmp_path, ext):
+    path = str(tmp_path / f'state.{ext}')
+    lampposts = [SimpleNamespace(x=10.5, y=300, max_birds=3),
+                 SimpleNamespace(x=20, y=310.25, max_birds=1)]
+    birds = [SimpleNamespace(x=1.5, y=2, sitting_time=1000)]
+    save(path, lampposts, birds)
+    data = read_all(path)
+    np.testing.assert_array_equal(data['lamppost']['x'], [10.5, 20])
+    np.testing.assert_array_equal(data['lamppost']['max_birds'], [3, 1])
+    np.testing.assert_array_equal(data['bird']['sitting_time'], [1000])
+
+
+JSONL_ERRORS = [
+    (b'{"type": "bird", "x": 1,\n', 'некорректный JSON'),
+    (b'[1, 2]\n', 'должна быть объектом'),
+    (b'{"type": "tree", "x": 1}\n', 'неизвестный тип'),
+    (b'{"type": "bird", "x": 1, "y": 2}\n', "нет поля 'sitting_time'"),
+    (b'{"type": "bird", "x": "1", "y": 2, "sitting_time": 1}\n', 'должно быть числом'),
+    (b'{"type": "bird", "x": true, "y": 2, "sitting_time": 1}\n', 'должно быть числом'),
+    (b'{"type": "bird", "x": NaN, "y": 2, "sitting_time": 1}\n', 'не конечно'),
+    (b'{"type": "bird", "x": 1, "y": 2, "sitting_time": -5}\n', 'отрицательным'),
+    (b'{"type": "lamppost", "x": 1, "y": 2, "max_birds": 0}\n', 'max_birds'),
+    (b'{"type": "lamppost", "x": 1, "y": 2, "max_birds": 2.5}\n', 'max_birds'),
+    (b'{"type": "lamppost", "x": 1, "y": 2, "max_birds": 3000000000}\n', 'max_birds'),
+    (b'{"type": "bird", "x": ' + b'9' * 400 + b', "y": 2, "sitting_time": 1}\n',
+     'слишком велико'),
+    (b'{"type": "bird", "x": ' + b'9' * 5000 + b', "y": 2, "sitting_time": 1}\n',
+     'некорректный JSON'),
+    (b'[' * 100000 + b'\n', 'вложенность'),
+    (b'{"type": "bird\xff"}\n', 'UTF-8'),
+]
+
+
+@pytest.mark.parametrize('line, message', JSONL_ERRORS)
+def test_jsonl_errors(tmp_path, line, message):
+    path = tmp_path / 'bad.jsonl'
+    good = b'{"type": "bird", "x": 1, "y": 2, "sitting_time": 1}\n'
+    path.write_bytes(good + line)
+    with pytest.raises(ScenarioError, match=message) as error:
+        read_all(str(path))
+    assert 'bad.jsonl:2' in str(error.value)
+
+
+JSON_ERRORS = [
+    (b'{"lampposts": [', 'некорректный JSON'),
+    (b'[]', "'lampposts' и 'birds'"),
+    (b'{"lampposts": []}', "'lampposts' и 'birds'"),
+    (b'{"lampposts": {}, "birds": []}', 'должно быть списком'),
+    (b'{"lampposts": [], "birds": [1]}', r'birds\[0\]: запись должна быть объектом'),
+    (b'{"lampposts": [],\n"birds": ["\xff"]}', r'bad\.json:2: текст не в UTF-8'),
+]
+
+
+@pytest.mark.parametrize('data, message', JSON_ERRORS)
+def test_json_errors(tmp_path, data, message):
+    path = tmp_path / 'bad.json'
+    path.write_bytes(data)
+    with pytest.raises(ScenarioError, match=message):
+        read_all(str(path))
+
+
+def binary_block(code, count, columns):
+    return BLOCK_HEADER.pack(code, count) + b''.join(
+        np.asarray(values, dtype=dtype).tobytes() for values, dtype in columns)
+
+
+BIRD_DTYPES = ('<f8', '<f8', '<f8')
+LAMPPOST_DTYPES = ('<f8', '<f8', '<i4')
+
+BINARY_ERRORS = [
+    (b'NOTASCN!', 'не является бинарным сценарием'),
+    (BINARY_MAGIC + b'\x01\x02', 'обрезанный заголовок'),
+    (BINARY_MAGIC + BLOCK_HEADER.pack(7, 0), 'неизвестный вид блока 7'),
+    (BINARY_MAGIC + BLOCK_HEADER.pack(1, 2) + b'\0' * 20, 'обрезанный блок'),
+    (BINARY_MAGIC + BLOCK_HEADER.pack(1, 2**32 - 1) + b'\0' * 16, 'обрезанный блок'),
+    (BINARY_MAGIC + binary_block(1, 1, zip(([np.nan], [0], [1]), BIRD_DTYPES)),
+     "bird #0: поле 'x' не конечно"),
+    (BINARY_MAGIC + binary_block(1, 2, zip(([0, 0], [0, 0], [1, -1]), BIRD_DTYPES)),
+     'bird #1: sitting_time'),
+    (BINARY_MAGIC + binary_block(0, 1, zip(([0], [0], [0]), LAMPPOST_DTYPES)),
+     'lamppost #0: max_birds'),
+]
+
+
+@pytest.mark.parametrize('data, message', BINARY_ERRORS)
+def test_binary_errors(tmp_path, data, message):
+    path = tmp_path / 'bad.bin'
+    path.write_bytes(data)
+    with pytest.raises(ScenarioError, match=message):
+        read_all(str(path))
+
+
+def test_binary_error_index_counts_earlier_blocks(tmp_path):
+    path = str(tmp_path / 'blocks.bin')
+    with ScenarioWriter(path) as writer:
+        writer.write('bird', {'x': [0, 0], 'y': [0, 0], 'sitting_time': [1, 1]})
+    with open(path, 'ab') as f:
+        f.write(binary_block(1, 1, zip(([0], [0], [-1]), BIRD_DTYPES)))
+    with pytest.raises(ScenarioError, match='bird #2'):
+        read_all(path)
+
+
+def test_unknown_format_and_missing_file(tmp_path):
+    with pytest.raises(ScenarioError, match='неизвестный формат'):
+        read_chunks(str(tmp_path / 'state.txt'))
+    with pytest.raises(ScenarioError, match='не найден'):
+        read_chunks(str(tmp_path / 'missing.jsonl'))
+    with pytest.raises(ScenarioError, match='только в .jsonl и .bin'):
+        ScenarioWriter(str(tmp_path / 'state.json'))
+
+
+def test_unreadable_path_is_scenario_error(tmp_path):
+    # Каталог вместо файла: open падает с OSError, а не FileNotFoundError
+    path = tmp_path / 'dir.jsonl'
+    path.mkdir()
+    with pytest.raises(ScenarioError, match='не удаётся открыть'):
+        read_chunks(str(path))
+    with pytest.raises(ScenarioError, match='не удаётся открыть'):
+        ScenarioWriter(str(path))
+
+
+@pytest.mark.parametrize('args, message', [
+    ({'num_lampposts': -5}, 'отрицательным'),
+    ({'num_birds': -1}, 'отрицательным'),
+    ({'clusters': 0}, 'хотя бы одна'),
+    ({'waves': 0}, 'хотя бы одна'),
+    ({'world_width': 50}, 'больше 100'),
+    ({'world_width': float('nan')}, 'больше 100'),
+])
+def test_generate_rejects_bad_parameters(tmp_path, args, message):
+    path = tmp_path / 'scenario.jsonl'
+    params = {'num_lampposts': 10, 'num_birds': 10}
+    params.update(args)
+    with pytest.raises(ValueError, match=message):
+        generate(str(path), **params)
+    assert not path.exists()
+
+
+def test_shipped_initial_state_loads():
+    path = os.path.join(os.path.dirname(__file__), 'initial_state.json')
+    data = read_all(path)
+    assert len(data['lamppost']['x']) > 0
+    assert len(data['bird']['x']) > 0
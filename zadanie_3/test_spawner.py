@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+import pytest
+
+from spawner import FIXED, POISSON, SpawnSource, Spawner, slider_to_rate
+from world import World
+
+
+def run(spawner, steps, delta_time=1 / 60):
+    # Для каждого шага — список партий (вид, xs, ys)
+    return [[(batch.kind, batch.xs, batch.ys) for batch in spawner.step(delta_time)]
+            for _ in range(steps)]
+
+
+def counts(steps):
+    return [sum(len(xs) for _, xs, _ in step) for step in steps]
+
+
+@pytest.mark.parametrize('rate, delta_time', [(7.3, 1 / 60), (150, 1 / 60), (0.4, 0.7), (3, 0.1)])
+def test_fixed_rate_is_exact(rate, delta_time):
+    spawner = Spawner(seed=1)
+    spawner.add_source(SpawnSource('bird', rate, (0, 0, 10, 10), FIXED))
+    total = 0
+    for step in range(1, 601):
+        total += sum(len(batch) for batch in spawner.step(delta_time))
+        # К любому моменту появилось ровно floor(rate * t) объектов
+        assert total == math.floor(rate * step * delta_time + 1e-9)
+
+
+def test_batch_within_region():
+    spawner = Spawner(seed=2)
+    spawner.add_source(SpawnSource('lamppost', 1000, (50, 300, 750, 380), FIXED,
+                                   {'max_birds': 2}))
+    (batch,) = spawner.step(0.5)
+    assert len(batch) == 500
+    assert batch.attributes == {'max_birds': 2}
+    assert ((50 <= batch.xs) & (batch.xs <= 750)).all()
+    assert ((300 <= batch.ys) & (batch.ys <= 380)).all()
+
+
+def test_poisson_is_reproducible_with_seed():
+    def make(seed):
+        spawner = Spawner(seed)
+        spawner.add_source(SpawnSource('bird', 40, (0, 0, 100, 100), POISSON))
+        return run(spawner, 300)
+
+    a, b, c = make(7), make(7), make(8)
+    assert counts(a) == counts(b)
+    for step_a, step_b in zip(a, b):
+        for (_, xs_a, ys_a), (_, xs_b, ys_b) in zip(step_a, step_b):
+            np.testing.assert_array_equal(xs_a, xs_b)
+            np.testing.assert_array_equal(ys_a, ys_b)
+    assert counts(a) != counts(c)
+    assert abs(sum(counts(a)) - 40 * 5) < 5 * math.sqrt(40 * 5)
+
+
+def test_adding_source_keeps_existing_sequences():
+    alone = Spawner(seed=3)
+    alone.add_source(SpawnSource('bird', 40, (0, 0, 100, 100), POISSON))
+    shared = Spawner(seed=3)
+    shared.add_source(SpawnSource('bird', 40, (0, 0, 100, 100), POISSON))
+    shared.add_source(SpawnSource('lamppost', 25, (0, 0, 100, 100), POISSON))
+
+    for step_alone, step_shared in zip(run(alone, 200), run(shared, 200)):
+        birds = [(xs, ys) for kind, xs, ys in step_shared if kind == 'bird']
+        assert len(birds) == len(step_alone)
+        for (_, xs, ys), (xs_shared, ys_shared) in zip(step_alone, birds):
+            np.testing.assert_array_equal(xs, xs_shared)
+            np.testing.assert_array_equal(ys, ys_shared)
+
+
+def test_unknown_process_rejected():
+    with pytest.raises(ValueError, match='Неизвестный процесс'):
+        SpawnSource('bird', 1, (0, 0, 1, 1), 'burst')
+
+
+def test_slider_to_rate():
+    assert slider_to_rate(0, 150) == 0
+    assert slider_to_rate(1, 150) == pytest.approx(0.1)
+    assert slider_to_rate(100, 150) == pytest.approx(150)
+    rates = [slider_to_rate(v, 150) for v in range(1, 101)]
+    assert rates == sorted(rates)
+
+
+def test_world_reuses_pooled_birds():
+    world = World(seed=4)
+    world.bird_source.rate = 600
+    world.bird_source.process = FIXED
+    world.update(1 / 60)
+    assert world.spawned_birds == 10
+    first = list(world.birds)
+
+    # Все птицы улетают за границу мира и попадают в пул
+    for bird in first:
+        bird.y = -10 * world.height
+        bird.start_flying_up()
+    world.bird_source.rate = 0
+    world.update(1 / 60)
+    assert world.birds == []
+    assert world.departed_birds == 10
+    assert len(world.bird_pool) == 10
+
+    world.bird_source.rate = 600
+    world.update(1 / 60)
+    assert world.spawned_birds == 20
+    assert {id(bird) for bird in world.birds} == {id(bird) for bird in first}
+    assert world.bird_pool == []
+    for bird in world.birds:
+        assert not bird.flying_up and not bird.gone and bird.time_sat == 0
+        assert 10 <= bird.y <= 40
@@ -0,0 +1,244 @@
+import argparse
+import random
+import sys
+import time
+from itertools import chain
+from models import (Bird, LampPost, StandingLampPosts, FRAME_RATE, BIRD_RADIUS,
+                    LAMPPOST_WIDTH, LAMPPOST_HEIGHT, LAMPPOST_CROSSBAR,
+                    WORLD_WIDTH, WORLD_HEIGHT, WORLD_MARGIN, world_size)
+from camera import SpatialGrid
+from spawner import Spawner, SpawnSource, FIXED, POISSON
+from scenario import ScenarioError, read_chunks, save
+
+NUM_BIRDS = 11
+NUM_LAMPPOSTS = 6
+
+
+class World:
+    def __init__(self, seed=None):
+        # Птицы и столбы используют модуль random, поэтому он тоже получает зерно
+        if seed is not None:
+            random.seed(seed)
+        self.birds = []
+        self.lampposts = []
+        self.standing_lampposts = StandingLampPosts()
+        self.fallen_lampposts = {}  # Упорядоченное множество упавших столбов
+        self.bird_pool = []  # Удалённые птицы для повторного использования
+        self.width = WORLD_WIDTH
+        self.height = WORLD_HEIGHT
+
+        # Пространственные индексы для отрисовки видимой части мира
+        self.lamppost_grid = SpatialGrid()
+        self.bird_grid = SpatialGrid()
+
+        # Источники появления птиц и столбов (частота задаётся снаружи)
+        self.spawner = Spawner(seed)
+        self.bird_source = self.spawner.add_source(SpawnSource(
+            'bird', 0, self.bird_spawn_region(), POISSON,
+            {'sitting_time': 100000}))
+        self.lamppost_source = self.spawner.add_source(SpawnSource(
+            'lamppost', 0, self.lamppost_spawn_region(), POISSON,
+            {'max_birds': 2}))
+
+        self.spawned_birds = 0
+        self.departed_birds = 0
+        self.collapses = 0
+
+    def bird_spawn_region(self):
+        return (50, 10, self.width - 50, 40)
+
+    def lamppost_spawn_region(self):
+        return (50, 300, self.width - 50, 380)
+
+    def load(self, path, bird_limit=None, lamppost_limit=None):
+        # Сценарий читается блоками; ошибки формата и превышение лимитов
+        # передаются наверх (ScenarioError)
+        for kind, columns in read_chunks(path):
+            if kind == 'lamppost':
+                if lamppost_limit is not None and len(self.lampposts) + len(columns['x']) > lamppost_limit:
+                    raise ScenarioError(
+                        f"{path}: больше {lamppost_limit} столбов — слишком много для этого режима")
+                for x, y, max_birds in zip(columns['x'].tolist(),
+                                           columns['y'].tolist(),
+                                           columns['max_birds'].tolist()):
+                    self.add_lamppost(LampPost(x, y, max_birds))
+            else:
+                if bird_limit is not None and len(self.birds) + len(columns['x']) > bird_limit:
+                    raise ScenarioError(
+                        f"{path}: больше {bird_limit} птиц — слишком много для этого режима")
+                for x, y, sitting_time in zip(columns['x'].tolist(),
+                                              columns['y'].tolist(),
+                                              columns['sitting_time'].tolist()):
+                    self.birds.append(Bird(x, y, sitting_time))
+        self.fit()
+
+    def create_default(self):
+        # Создание столбов
+        for _ in range(NUM_LAMPPOSTS):
+            x = random.randint(50, WORLD_WIDTH - 50)
+            y = random.randint(300, 380)
+            max_birds = 2
+            lamppost = LampPost(x, y, max_birds)
+            self.add_lamppost(lamppost)
+
+        # Создание птиц
+        for _ in range(NUM_BIRDS):
+            x = random.randint(50, WORLD_WIDTH - 50)
+            y = random.randint(50, 150)
+            sitting_time = 100000
+            bird = Bird(x, y, sitting_time)
+            self.birds.append(bird)
+        self.fit()
+
+    def fit(self):
+        # Границы мира вмещают все загруженные столбы и птиц
+        max_x = max(chain((lp.x + lp.width for lp in self.lampposts),
+                          (bird.x for bird in self.birds)), default=0)
+        max_y = max(chain((lp.y + lp.height for lp in self.lampposts),
+                          (bird.y for bird in self.birds)), default=0)
+        self.width, self.height = world_size(max_x, max_y)
+        self.bird_source.region = self.bird_spawn_region()
+        self.lamppost_source.region = self.lamppost_spawn_region()
+        self.rebuild_bird_grid()
+
+    def save(self, path):
+        save(path, self.lampposts, self.birds)
+
+    def update(self, delta_time):
+        # Появление новых птиц и столбов: всё, что положено за шаг, одной партией
+        for batch in self.spawner.step(delta_time):
+            if batch.kind == 'bird':
+                self.spawn_birds(batch)
+            else:
+                self.spawn_lampposts(batch)
+
+        # Улетевшие насовсем и взлетевшие за границы мира птицы удаляются
+        # и возвращаются в пул
+        remaining_birds = []
+        active_lampposts = {}
+        bird_grid = self.bird_grid
+        for bird in self.birds:
+            x, y = bird.x, bird.y
+            bird.update(delta_time, self.standing_lampposts)
+
+            if bird.gone or (bird.flying_up and (
+                    bird.y < -WORLD_MARGIN or bird.y > self.height + WORLD_MARGIN
+                    or bird.x < -WORLD_MARGIN or bird.x > self.width + WORLD_MARGIN)):
+                self.bird_pool.append(bird)
+                bird_grid.remove(bird)
+                self.departed_birds += 1
+                continue
+            remaining_birds.append(bird)
+            if bird.is_sitting and bird.current_lamppost is not None:
+                active_lampposts[bird.current_lamppost] = None
+            # Сетка для отрисовки: птица перекладывается, только когда
+            # сдвинулась и перешла в другую клетку
+            if bird.x != x or bird.y != y:
+                bird_grid.move(bird, bird.x, bird.y)
+        self.birds = remaining_birds
+
+        # Обновление столбов: упасть может только столб с сидящими птицами,
+        # а восстанавливаются упавшие, поэтому остальные столбы не обходим
+        active_lampposts.update(self.fallen_lampposts)
+        for lp in active_lampposts:
+            was_standing = lp.status == 'standing'
+            lp.update(delta_time)
+            if was_standing and lp.status != 'standing':
+                self.standing_lampposts.remove(lp)
+                self.fallen_lampposts[lp] = None
+                self.collapses += 1
+            elif not was_standing and lp.status == 'standing':
+                self.standing_lampposts.add(lp)
+                del self.fallen_lampposts[lp]
+
+    def spawn_birds(self, batch):
+        # Птицы берутся из пула, новые создаются, только когда он пуст
+        sitting_time = batch.attributes['sitting_time']
+        pool = self.bird_pool
+        birds = self.birds
+        for x, y in zip(batch.xs.tolist(), batch.ys.tolist()):
+            if pool:
+                bird = pool.pop()
+                bird.reset(x, y, sitting_time)
+            else:
+                bird = Bird(x, y, sitting_time)
+            birds.append(bird)
+            self.bird_grid.insert(bird, x, y)
+        self.spawned_birds += len(batch)
+
+    def spawn_lampposts(self, batch):
+        max_birds = batch.attributes['max_birds']
+        for x, y in zip(batch.xs.tolist(), batch.ys.tolist()):
+            self.add_lamppost(LampPost(x, y, max_birds))
+
+    def add_lamppost(self, lamppost):
+        self.lampposts.append(lamppost)
+        self.standing_lampposts.add(lamppost)
+        self.lamppost_grid.insert(lamppost, lamppost.x, lamppost.y)
+
+    def visible_lampposts(self, x0, y0, x1, y1):
+        # Столб индексируется по левому верхнему углу: запас на ширину,
+        # высоту и выступающую перекладину
+        left = x0 - LAMPPOST_WIDTH - LAMPPOST_CROSSBAR
+        right = x1 + LAMPPOST_CROSSBAR
+        top = y0 - LAMPPOST_HEIGHT
+        return [lp for lp in self.lamppost_grid.query(left, top, right, y1)
+                if left <= lp.x <= right and top <= lp.y <= y1]
+
+    def visible_birds(self, x0, y0, x1, y1):
+        return [bird for bird in self.bird_grid.query(x0 - BIRD_RADIUS, y0 - BIRD_RADIUS,
+                                                      x1 + BIRD_RADIUS, y1 + BIRD_RADIUS)
+                if x0 - bird.radius <= bird.x <= x1 + bird.radius
+                and y0 - bird.radius <= bird.y <= y1 + bird.radius]
+
+    def rebuild_bird_grid(self):
+        self.bird_grid.clear()
+        for bird in self.birds:
+            self.bird_grid.insert(bird, bird.x, bird.y)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Нагрузочная проверка: появление и обновление птиц без окна')
+    parser.add_argument('scenario', nargs='?',
+                        help='начальное состояние (по умолчанию как в окне без файла)')
+    parser.add_argument('--bird-rate', type=float, default=5000,
+                        help='птиц в секунду')
+    parser.add_argument('--seconds', type=float, default=10,
+                        help='модельное время')
+    parser.add_argument('--process', choices=(FIXED, POISSON), default=POISSON)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    world = World(args.seed)
+    try:
+        if args.scenario:
+            world.load(args.scenario)
+        else:
+            world.create_default()
+    except ScenarioError as e:
+        print(f"Ошибка сценария: {e}", file=sys.stderr)
+        sys.exit(1)
+    world.bird_source.rate = args.bird_rate
+    world.bird_source.process = args.process
+
+    delta_time = 1 / FRAME_RATE
+    steps = int(round(args.seconds * FRAME_RATE))
+    slowest = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        tick_start = time.perf_counter()
+        world.update(delta_time)
+        slowest = max(slowest, time.perf_counter() - tick_start)
+    elapsed = time.perf_counter() - start
+
+    print(f"Шагов: {steps}, появилось птиц: {world.spawned_birds} "
+          f"(ожидалось {args.bird_rate * steps * delta_time:.0f}), "
+          f"улетело: {world.departed_birds}, в мире: {len(world.birds)}")
+    print(f"Время: {elapsed:.2f} с, {world.spawned_birds / elapsed:.0f} птиц/с, "
+          f"шаг в среднем {elapsed / steps * 1000:.1f} мс, "
+          f"худший {slowest * 1000:.1f} мс (бюджет кадра {delta_time * 1000:.1f} мс)")
+
+
+if __name__ == '__main__':
+    main()